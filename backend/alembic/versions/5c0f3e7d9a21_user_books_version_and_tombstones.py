@@ -0,0 +1,47 @@
+"""user_books change version & shelf tombstones
+
+Revision ID: 5c0f3e7d9a21
+Revises: 053cac454d6a
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0f3e7d9a21'
+down_revision: Union[str, None] = '053cac454d6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('library_version', sa.Integer(), nullable=False, server_default='0'))
+
+    with op.batch_alter_table('user_books') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.alter_column('shelf', existing_type=sa.String(), nullable=True)
+        batch_op.create_index('ix_user_books_user_version', ['user_id', 'version'], unique=False)
+
+    # existing rows become change #1 so a first sync with since=0 returns them
+    op.execute("UPDATE user_books SET version = 1")
+    op.execute(
+        "UPDATE users SET library_version = 1 "
+        "WHERE id IN (SELECT DISTINCT user_id FROM user_books)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM user_books WHERE shelf IS NULL")
+
+    with op.batch_alter_table('user_books') as batch_op:
+        batch_op.drop_index('ix_user_books_user_version')
+        batch_op.alter_column('shelf', existing_type=sa.String(), nullable=False)
+        batch_op.drop_column('version')
+
+    op.drop_column('users', 'library_version')
@@ -0,0 +1,43 @@
+"""user_shelf_counts aggregate & book sort indexes
+
+Revision ID: 8b4d2a6f1c37
+Revises: 5c0f3e7d9a21
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4d2a6f1c37'
+down_revision: Union[str, None] = '5c0f3e7d9a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_shelf_counts',
+        sa.Column('user_id', sa.String(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('shelf', sa.String(), primary_key=True),
+        sa.Column('count', sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO user_shelf_counts (user_id, shelf, count) "
+        "SELECT user_id, shelf, COUNT(*) FROM user_books "
+        "WHERE shelf IS NOT NULL GROUP BY user_id, shelf"
+    )
+    # functional indexes: `?sort=` orders by lower(...) for collation-free results
+    op.create_index('ix_books_title_lower', 'books', [sa.text('lower(title)')], unique=False)
+    op.create_index('ix_books_authors_lower', 'books', [sa.text('lower(authors)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_authors_lower', table_name='books')
+    op.drop_index('ix_books_title_lower', table_name='books')
+    op.drop_table('user_shelf_counts')
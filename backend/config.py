@@ -43,6 +43,21 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # ───── Shelf-change events (SSE) ──────────────────────────────────
+    EVENTS_BACKEND: str = Field(default="memory", pattern="^(memory|redis)$")
+    REDIS_URL: str | None = None         # required when EVENTS_BACKEND=redis
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+    EVENTS_TOKEN_EXPIRE_SECONDS: int = 60   # ?token= for EventSource, connect-time only
+
+    # ───── HTTP compression & caching ─────────────────────────────────
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024     # bytes; smaller bodies go out as-is
+    COMPRESSION_ENCODINGS: str = "br,zstd,gzip"   # preference order
+    CATALOG_CACHE_MAX_AGE: int = 3600    # seconds, for /books/{id}/catalog
+
+    # ───── Shared catalog snapshot (mmap'd by every worker) ───────────
+    CATALOG_SNAPSHOT_PATH: str | None = None   # e.g. data/catalog.snap; unset = off
+
     # ───── Derived fields ────────────────────────────────────────────
     @computed_field
     @property
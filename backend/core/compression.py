@@ -0,0 +1,120 @@
+"""
+Response compression middleware.
+
+* Negotiates `Accept-Encoding` against the encoders installed here:
+  br (`brotli`), zstd (`zstandard`) and always gzip (stdlib).
+* Only one-shot bodies ≥ `minimum_size` are compressed; streamed
+  responses (SSE) and already-encoded bodies pass through untouched.
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import Callable, Dict
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:                                   # optional dependency
+    import brotli
+except ImportError:                    # pragma: no cover
+    brotli = None
+
+try:                                   # optional dependency
+    import zstandard
+except ImportError:                    # pragma: no cover
+    zstandard = None
+
+
+# ── Encoders (levels tuned for per-request latency, not max ratio) ────────
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6, mtime=0),
+}
+if brotli is not None:
+    ENCODERS["br"] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    # ZstdCompressor isn't thread-safe → one per call (cheap at level 3)
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+
+# bodies above this are compressed in a worker thread so the event loop
+# (other requests, SSE heartbeats) isn't stalled for the ~20 ms it takes
+THREAD_THRESHOLD = 32 * 1024
+
+
+def negotiate(accept_encoding: str, preferred: list[str]) -> str | None:
+    """
+    Pick the first server-preferred encoding the client accepts (q > 0).
+    `*` only stands in for codings the client didn't name with `q=0`.
+    """
+    accepted, refused = set(), set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            ok = not q or float(q) > 0
+        except ValueError:
+            continue
+        (accepted if ok else refused).add(name.strip())
+    for enc in preferred:
+        if enc not in ENCODERS or enc in refused:
+            continue
+        if enc in accepted or "*" in accepted:
+            return enc
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = encodings or ["br", "zstd", "gzip"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        start: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message          # hold until we've seen the body
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            eligible = (
+                not message.get("more_body", False)
+                and "content-encoding" not in headers
+                and not headers.get("content-type", "").startswith("text/event-stream")
+            )
+            if eligible:
+                headers.add_vary_header("Accept-Encoding")
+            if eligible and encoding and len(body) >= self.minimum_size:
+                encode = ENCODERS[encoding]
+                if len(body) > THREAD_THRESHOLD:
+                    body = await anyio.to_thread.run_sync(encode, body)
+                else:
+                    body = encode(body)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                message = {**message, "body": body}
+
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
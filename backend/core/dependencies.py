@@ -4,9 +4,10 @@ Security / dependency helpers.
 * HTTPBearer → Swagger shows a single header field for the JWT
 * get_db       → one DB session per request
 * get_current_user → validates token & returns User
+* get_stream_user  → same, from the `?token=` EventSource connects with
 """
 
-from fastapi import Depends, HTTPException, Security, status
+from fastapi import Depends, HTTPException, Query, Security, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
@@ -46,3 +47,23 @@ def get_current_user(
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found / inactive")
     return user
+
+
+# ── SSE-user dependency ───────────────────────────────────────────────────
+def get_stream_user(
+    token: str = Query(..., description="From `POST /books/events/token`"),
+) -> User:
+    """
+    EventSource can't send `Authorization`, so the stream authenticates with
+    a short-lived `scope=events` token. Plain `def` → runs in the threadpool,
+    and its own short session returns the connection before streaming starts.
+    """
+    user_id = decode_token(token, scope="events")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired stream token")
+
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="User not found / inactive")
+    return user
@@ -0,0 +1,142 @@
+"""
+Shelf-change fan-out for the SSE stream.
+
+* publish()   → called from `move_book` (sync, threadpool) after commit
+* subscribe() → async context manager used by `GET /books/events`
+
+Backends (settings.EVENTS_BACKEND):
+* memory → in-process queues; fine for a single worker
+* redis  → every worker PUBLISHes to Redis and one listener task per
+           worker relays messages into its local queues, so a change made
+           on worker A reaches a stream held open by worker B.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator
+
+from config import settings
+
+try:                                   # optional dependency
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:                    # pragma: no cover
+    redis = None
+    aioredis = None
+
+CHANNEL_PREFIX = "myreads:shelf:"
+QUEUE_SIZE = 100
+RESYNC = json.dumps({"type": "resync"})
+RELAY_BACKOFF = (0.5, 30.0)            # reconnect delay: first, max (doubles)
+
+logger = logging.getLogger(__name__)
+
+
+class ShelfEventBroker:
+    """Per-user fan-out of small shelf deltas to open SSE streams."""
+
+    def __init__(self, backend: str = "memory", redis_url: str | None = None):
+        if backend == "redis" and (redis is None or not redis_url):
+            raise RuntimeError("EVENTS_BACKEND=redis needs the `redis` package and REDIS_URL")
+        self.backend = backend
+        self.redis_url = redis_url
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = (
+            defaultdict(set)
+        )
+        self._publisher = redis.Redis.from_url(redis_url) if backend == "redis" else None
+        self._listener: asyncio.Task | None = None
+
+    # ── publishing (sync; runs inside FastAPI's threadpool) ──────────────
+    def publish(self, user_id: str, event: dict[str, Any]) -> None:
+        """
+        Best effort: runs after the shelf change is committed, so a broken
+        backend must not turn it into an error. Clients recover a lost event
+        via `GET /books/changes`.
+        """
+        payload = json.dumps(event)
+        try:
+            if self._publisher is not None:
+                self._publisher.publish(CHANNEL_PREFIX + user_id, payload)
+            else:
+                self._fan_out(user_id, payload)
+        except Exception:
+            logger.exception("Failed to publish shelf event for user %s", user_id)
+
+    def _fan_out(self, user_id: str, payload: str) -> None:
+        for loop, queue in list(self._subscribers.get(user_id, ())):
+            loop.call_soon_threadsafe(_offer, queue, payload)
+
+    def _resync_all(self) -> None:
+        """Tell every open stream on this worker it may have missed events."""
+        for user_id in list(self._subscribers):
+            self._fan_out(user_id, RESYNC)
+
+    # ── subscribing (async; one queue per open stream) ───────────────────
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        entry = (loop, queue)
+        self._subscribers[user_id].add(entry)
+        if self.backend == "redis" and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._relay())
+        try:
+            yield queue
+        finally:
+            subs = self._subscribers.get(user_id)
+            if subs is not None:
+                subs.discard(entry)
+                if not subs:
+                    del self._subscribers[user_id]
+
+    async def _relay(self) -> None:
+        """
+        Forward Redis messages for this worker's subscribers, forever.
+
+        Any failure is logged and retried with exponential backoff. Each time
+        the pattern subscription is (re)confirmed every local stream gets a
+        `resync`: whatever was published while we weren't listening – a Redis
+        outage, or the gap before the very first `psubscribe` – is lost.
+        """
+        delay = RELAY_BACKOFF[0]
+        while True:
+            client = aioredis.Redis.from_url(self.redis_url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                async for msg in pubsub.listen():
+                    if msg.get("type") == "psubscribe":
+                        delay = RELAY_BACKOFF[0]
+                        self._resync_all()
+                    elif msg.get("type") == "pmessage":
+                        user_id = msg["channel"].decode()[len(CHANNEL_PREFIX):]
+                        self._fan_out(user_id, msg["data"].decode())
+                raise ConnectionError("Redis pub/sub stream ended")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Shelf event relay failed; reconnecting in %.1fs", delay)
+            finally:
+                with suppress(Exception):
+                    await pubsub.aclose()
+                    await client.aclose()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RELAY_BACKOFF[1])
+
+
+def _offer(queue: asyncio.Queue, payload: str) -> None:
+    """Enqueue without blocking; a slow client gets a single `resync` instead."""
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+broker = ShelfEventBroker(settings.EVENTS_BACKEND, settings.REDIS_URL)
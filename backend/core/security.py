@@ -25,12 +25,14 @@ def verify_password(password: str, hashed_password: str) -> bool:
 
 
 # ─── JWT helpers ───────────────────────────────────────────────
-def _create_token(*, subject: str, expires_delta: timedelta) -> str:
+def _create_token(*, subject: str, expires_delta: timedelta, scope: str | None = None) -> str:
     payload: dict[str, Any] = {
         "sub": subject,
         "exp": datetime.now(timezone.utc) + expires_delta,
         "iat": datetime.now(timezone.utc),
     }
+    if scope:
+        payload["scope"] = scope
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
@@ -48,9 +50,21 @@ def create_refresh_token(user_id: str) -> str:
     )
 
 
-def decode_token(token: str) -> str | None:
+def create_stream_token(user_id: str) -> str:
+    """Short-lived token for `EventSource`, which can't send headers."""
+    return _create_token(
+        subject=user_id,
+        expires_delta=timedelta(seconds=settings.EVENTS_TOKEN_EXPIRE_SECONDS),
+        scope="events",
+    )
+
+
+def decode_token(token: str, scope: str | None = None) -> str | None:
+    """Return the subject, but only if the token carries exactly *scope*."""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload.get("sub")
     except JWTError:
         return None
+    if payload.get("scope") != scope:
+        return None
+    return payload.get("sub")
@@ -1,13 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import SQLAlchemyError
 
 from config import settings
-from utils.seeder import seed_books
-from routers import auth, books
+from core.compression import CompressionMiddleware
+from database import engine
+from utils.catalog_snapshot import snapshot
+from utils.migrate import current_revisions, head_revisions
+from routers import auth, books, me
 
-# ─── Seed once if flag on ───────────────────────────────────────
-if settings.SEED_DB:
-    seed_books()
+# Migrations + seeding run BEFORE the workers start (`python -m utils.migrate`),
+# so N workers × M containers never race on them.
 
 # ─── FastAPI app ────────────────────────────────────────────────
 app = FastAPI(title="MyReads Backend")
@@ -18,13 +21,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Missing-Ids"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=[e.strip() for e in settings.COMPRESSION_ENCODINGS.split(",")],
+    )
+
 # ─── Routers ────────────────────────────────────────────────────
 app.include_router(auth.router)
 app.include_router(books.router)
+app.include_router(me.router)
 
 
 @app.get("/")
 def root():
     return {"status": "running"}
+
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness probe: DB reachable *and* schema at the shipped head."""
+    head = sorted(head_revisions())
+    try:
+        with engine.connect() as conn:
+            current = sorted(current_revisions(conn))
+    except SQLAlchemyError as exc:
+        response.status_code = 503
+        return {"status": "db-unavailable", "error": exc.__class__.__name__}
+
+    pool = engine.pool
+    version = snapshot.version
+    body = {
+        "status": "ready" if current == head else "migrating",
+        "schema": {"current": current, "head": head},
+        "pool": {
+            "status": pool.status(),
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        },
+        # content hash of the mmap'd catalog; null = not configured / not mapped
+        "catalog_snapshot": f"{version:016x}" if version is not None else None,
+    }
+    if current != head:
+        response.status_code = 503
+    return body
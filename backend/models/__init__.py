@@ -1,5 +1,6 @@
 from .book import Book
 from .user import User
 from .bookshelf import UserBookShelf     # <— NEW
+from .shelf_count import UserShelfCount
 
-__all__: list[str] = ["Book", "User", "UserBookShelf"]
+__all__: list[str] = ["Book", "User", "UserBookShelf", "UserShelfCount"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, Index, String, Text, func
 from database import Base
 
 
@@ -10,3 +10,8 @@ class Book(Base):
     authors     = Column(String)          # "Neil Gaiman, Terry Pratchett"
     thumbnail   = Column(String)          # URL
     description = Column(Text)            # Book description text
+
+    __table_args__ = (                    # case-insensitive `?sort=`
+        Index("ix_books_title_lower", func.lower(title)),
+        Index("ix_books_authors_lower", func.lower(authors)),
+    )
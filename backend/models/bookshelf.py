@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, Index, String, UniqueConstraint
 from database import Base
 
 
@@ -8,12 +8,18 @@ class UserBookShelf(Base):
 
     • user_id + book_id are unique together
     • shelf is one of: currentlyReading | wantToRead | read
+      (NULL = tombstone: the shelf was cleared, kept so delta sync sees it)
+    • version is the user's `library_version` at the row's last change
     """
     __tablename__ = "user_books"
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     book_id = Column(ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
-    shelf = Column(String, nullable=False)
+    shelf = Column(String, nullable=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
-    __table_args__ = (UniqueConstraint("user_id", "book_id", name="uq_user_book"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "book_id", name="uq_user_book"),
+        Index("ix_user_books_user_version", "user_id", "version"),
+    )
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Integer, String
+from database import Base
+
+
+class UserShelfCount(Base):
+    """
+    Precomputed number of books per (user, shelf).
+
+    Maintained by `move_book` in the same transaction as the pivot change,
+    so `GET /me/stats` never has to COUNT(*) over `user_books`.
+    """
+    __tablename__ = "user_shelf_counts"
+
+    user_id = Column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    shelf = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
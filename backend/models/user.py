@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Integer
 from sqlalchemy.sql import func
 from database import Base
 
@@ -12,6 +12,8 @@ class User(Base):
     hashed_pw  = Column(String, nullable=False)
     is_active  = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # bumped on every shelf change; high-water mark for GET /books/changes
+    library_version = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 # ── make sure import * exposes the symbol and breaks no cycles ──
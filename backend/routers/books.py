@@ -4,17 +4,28 @@ routers/books.py
 FastAPI router for book & shelf operations.
 """
 
-from typing import List, Optional
+import asyncio
+import hashlib
+import json
+from typing import List, Optional, Set
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Security
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, Security
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 
-from core.dependencies import get_db, get_current_user
+from config import settings
+from core.dependencies import get_db, get_current_user, get_stream_user
+from core.security import create_stream_token
+from core.events import broker
 from models.book import Book as BookORM
 from models.bookshelf import UserBookShelf as Pivot
+from models.shelf_count import UserShelfCount as ShelfCount
 from models.user import User
-from schemas.book import Book, ImageLinks
+from schemas.book import Book, BookChanges, ImageLinks, ShelfChange
+from schemas.token import StreamToken
+from utils.catalog_snapshot import snapshot
 
 # ────────────────────────────────────────────────────────────────────
 # Pydantic payloads
@@ -30,84 +41,367 @@ class SearchPayload(BaseModel):
 
 # ────────────────────────────────────────────────────────────────────
 router = APIRouter(prefix="/books", tags=["books"])
-# (Each route still has user: User = Security(get_current_user))
+# (Each route still has user: User = Security(get_current_user),
+#  except the public, CDN-cacheable `/{book_id}/catalog`)
 
 # ────────────────────────────────────────────────────────────────────
 # Helpers
 # ────────────────────────────────────────────────────────────────────
-def to_schema(book: BookORM, shelf: Optional[str] = None) -> Book:
-    img = ImageLinks(thumbnail=book.thumbnail) if book.thumbnail else None
-    authors = book.authors.split(", ") if book.authors else []
-    return Book(
-        id=book.id,
-        title=book.title,
-        authors=authors,
-        shelf=shelf,
-        imageLinks=img,
-        description=book.description,
+# `fields=` name → ORM columns it needs (shelf comes from the pivot)
+FIELD_COLUMNS = {
+    "id": (BookORM.id,),
+    "title": (BookORM.title,),
+    "authors": (BookORM.authors,),
+    "imageLinks": (BookORM.thumbnail,),
+    "description": (BookORM.description,),
+    "shelf": (),
+}
+
+SHELVES = ("currentlyReading", "wantToRead", "read")
+MAX_BATCH_IDS = 300
+
+# case-insensitive so SQLite & Postgres agree (backed by lower(...) indexes)
+SORT_COLUMNS = {"title": func.lower(BookORM.title), "author": func.lower(BookORM.authors)}
+
+FieldsQuery = Query(
+    None,
+    description="Comma-separated subset of: " + ", ".join(FIELD_COLUMNS),
+    examples=["title,authors,imageLinks,shelf"],
+)
+
+
+def to_schema(
+    book: BookORM, shelf: Optional[str] = None, fields: Optional[Set[str]] = None
+) -> Book:
+    if fields is None:
+        img = ImageLinks(thumbnail=book.thumbnail) if book.thumbnail else None
+        authors = book.authors.split(", ") if book.authors else []
+        return Book(
+            id=book.id,
+            title=book.title,
+            authors=authors,
+            shelf=shelf,
+            imageLinks=img,
+            description=book.description,
+        )
+
+    # sparse fieldset: only touch requested columns (others aren't loaded),
+    # and leave the rest *unset* so `response_model_exclude_unset` drops them
+    data = {"id": book.id}
+    if "title" in fields:
+        data["title"] = book.title
+    if "authors" in fields:
+        data["authors"] = book.authors.split(", ") if book.authors else []
+    if "imageLinks" in fields:
+        data["imageLinks"] = ImageLinks(thumbnail=book.thumbnail) if book.thumbnail else None
+    if "description" in fields:
+        data["description"] = book.description
+    if "shelf" in fields:
+        data["shelf"] = shelf
+    return Book.model_construct(**data)
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - FIELD_COLUMNS.keys()
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+
+def _book_rows(db: Session, user: User, fields: Optional[Set[str]]):
+    """
+    Query yielding `(BookORM, shelf)` in ONE round-trip: the user's pivot
+    row is outer-joined, and only the columns the fields need are loaded.
+    """
+    query = db.query(BookORM, Pivot.shelf).outerjoin(
+        Pivot, (Pivot.book_id == BookORM.id) & (Pivot.user_id == user.id)
+    )
+    if fields is not None:
+        cols = [c for f in fields for c in FIELD_COLUMNS[f]]
+        query = query.options(load_only(*cols))
+    return query
+
+
+def _id_order(db: Session):
+    """Byte order of `books.id` on every backend – same as the snapshot index."""
+    return BookORM.id.collate("C") if db.get_bind().dialect.name == "postgresql" else BookORM.id
+
+
+def _user_shelves(user: User, db: Session) -> dict:
+    """`{book_id: shelf}` for this user's shelved books (tombstones skipped)."""
+    return dict(
+        db.query(Pivot.book_id, Pivot.shelf)
+        .filter(Pivot.user_id == user.id, Pivot.shelf.isnot(None))
+        .all()
     )
 
 
+def _lookup(requested: List[str], query, shelves: Optional[dict], shelf: Optional[str]) -> dict:
+    """
+    `{id: (book, shelf)}` for *requested* ids. With *shelves* (the user's
+    pivot slice) catalog fields come from the mmap'd snapshot; ids it lacks
+    (stale snapshot) – or every id when *shelves* is None – go to the DB.
+    """
+    found = {}
+    if shelves is not None:
+        for book_id in requested:
+            entry = snapshot.get(book_id)
+            if entry is not None and (not shelf or shelves.get(book_id) == shelf):
+                found[book_id] = (entry, shelves.get(book_id))
+    rest = [i for i in requested if i not in found]
+    if rest:
+        found.update({b.id: (b, s) for b, s in query.filter(BookORM.id.in_(rest))})
+    return found
+
+
 def _shelf_for(user_id: str, book_id: str, db: Session) -> Optional[str]:
     row = db.query(Pivot.shelf).filter_by(user_id=user_id, book_id=book_id).first()
     return row[0] if row else None
 
 
+def _parse_ids(ids: str) -> List[str]:
+    """Split `ids=a,b,c`, dropping blanks & duplicates but keeping order."""
+    wanted = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+    if len(wanted) > MAX_BATCH_IDS:
+        raise HTTPException(400, f"At most {MAX_BATCH_IDS} ids per request")
+    return wanted
+
+
+def _cached_json(request: Request, body: Book, cache_control: str, **dump) -> Response:
+    """Serialise *body* with a weak ETag; answer 304 if the client has it."""
+    content = body.model_dump_json(**dump)
+    etag = f'W/"{hashlib.sha1(content.encode()).hexdigest()}"'
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if etag in {t.strip() for t in request.headers.get("if-none-match", "").split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
+
+
+def _bump_version(user_id: str, db: Session) -> int:
+    """Increment the user's change counter (row-locked until commit)."""
+    db.query(User).filter(User.id == user_id).update(
+        {User.library_version: User.library_version + 1}, synchronize_session=False
+    )
+    return db.query(User.library_version).filter(User.id == user_id).scalar()
+
+
+def _adjust_count(user_id: str, shelf: Optional[str], delta: int, db: Session) -> None:
+    """Keep `user_shelf_counts` in step with a pivot change (same txn)."""
+    if shelf is None:
+        return
+    updated = (
+        db.query(ShelfCount)
+        .filter_by(user_id=user_id, shelf=shelf)
+        .update({ShelfCount.count: ShelfCount.count + delta}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(ShelfCount(user_id=user_id, shelf=shelf, count=delta))
+
+
 # ────────────────────────────────────────────────────────────────────
 # SEARCH (declare BEFORE /{book_id} to avoid 404)
 # ────────────────────────────────────────────────────────────────────
-def _run_search(db: Session, user: User, query: str, max_results: int) -> List[Book]:
+def _run_search(
+    db: Session, user: User, query: str, max_results: int, fields: Optional[str] = None
+) -> List[Book]:
+    wanted = _parse_fields(fields)
     q = f"%{query.lower()}%"
     hits = (
-        db.query(BookORM)
+        _book_rows(db, user, wanted)
         .filter((BookORM.title.ilike(q)) | (BookORM.authors.ilike(q)))
         .limit(max_results)
         .all()
     )
-    return [to_schema(b, _shelf_for(user.id, b.id, db)) for b in hits]
+    return [to_schema(b, shelf, wanted) for b, shelf in hits]
 
 
-@router.post("/search", response_model=List[Book])
+@router.post("/search", response_model=List[Book], response_model_exclude_unset=True)
 def search_post(
     payload: SearchPayload,
+    fields: Optional[str] = FieldsQuery,
     db: Session = Depends(get_db),
     user: User = Security(get_current_user),
 ):
-    return _run_search(db, user, payload.query, payload.maxResults)
+    return _run_search(db, user, payload.query, payload.maxResults, fields)
 
 
-@router.get("/search", response_model=List[Book])
+@router.get("/search", response_model=List[Book], response_model_exclude_unset=True)
 def search_get(
     query: str = Query(..., min_length=1),
     maxResults: int = 20,
+    fields: Optional[str] = FieldsQuery,
+    db: Session = Depends(get_db),
+    user: User = Security(get_current_user),
+):
+    return _run_search(db, user, query, maxResults, fields)
+
+
+# ────────────────────────────────────────────────────────────────────
+# EVENTS (SSE) – pushes this user's shelf deltas from `move_book`
+# ────────────────────────────────────────────────────────────────────
+@router.post("/events/token", response_model=StreamToken)
+def shelf_events_token(user: User = Security(get_current_user)):
+    """Mint the short-lived `?token=` that `new EventSource(...)` connects with."""
+    return StreamToken(
+        token=create_stream_token(user.id),
+        expires_in=settings.EVENTS_TOKEN_EXPIRE_SECONDS,
+    )
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def shelf_events(
+    request: Request,
+    user: User = Depends(get_stream_user),
+):
+    user_id = user.id
+
+    async def stream():
+        async with broker.subscribe(user_id) as queue:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(
+                        queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                kind = json.loads(payload).get("type", "shelf")
+                yield f"event: {kind}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ────────────────────────────────────────────────────────────────────
+# DELTA SYNC – pivot rows changed since the client's last version
+# ────────────────────────────────────────────────────────────────────
+@router.get("/changes", response_model=BookChanges)
+def list_changes(
+    since: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     user: User = Security(get_current_user),
 ):
-    return _run_search(db, user, query, maxResults)
+    rows = (
+        db.query(Pivot.book_id, Pivot.shelf, Pivot.version)
+        .filter(Pivot.user_id == user.id, Pivot.version > since)
+        .order_by(Pivot.version)
+        .all()
+    )
+    changes = [ShelfChange(book_id=b, shelf=s, version=v) for b, s, v in rows]
+    version = max([user.library_version, *(c.version for c in changes)])
+    return BookChanges(version=version, changes=changes)
 
 
 # ────────────────────────────────────────────────────────────────────
 # CRUD
 # ────────────────────────────────────────────────────────────────────
-@router.get("", response_model=List[Book])
+@router.get("", response_model=List[Book], response_model_exclude_unset=True)
 def list_books(
+    response: Response,
+    ids: Optional[str] = Query(
+        None,
+        description=f"Comma-separated book ids (max {MAX_BATCH_IDS}); "
+        "results keep this order (`sort` is ignored); ids not found or "
+        "filtered out are listed in `X-Missing-Ids`",
+    ),
+    fields: Optional[str] = FieldsQuery,
+    sort: Optional[str] = Query(
+        None, pattern="^-?(title|author)$", description="title | author, `-` prefix = descending"
+    ),
+    author: Optional[str] = Query(None, min_length=1, description="Author name contains"),
+    shelf: Optional[str] = Query(None, pattern=f"^({'|'.join(SHELVES)})$"),
     db: Session = Depends(get_db),
     user: User = Security(get_current_user),
 ):
-    books = db.query(BookORM).all()
-    return [to_schema(b, _shelf_for(user.id, b.id, db)) for b in books]
+    wanted = _parse_fields(fields)
+    # catalog-only fields → serve from the shared snapshot (no author ILIKE /
+    # DB collation to mimic, so those requests stay on the DB)
+    use_snapshot = (
+        wanted is not None
+        and "description" not in wanted
+        and not author
+        and (ids is not None or not sort)
+        and snapshot.version is not None
+    )
+    shelves = None                      # None → no snapshot for this request
+    if use_snapshot:
+        shelves = _user_shelves(user, db) if shelf or "shelf" in wanted else {}
+
+    query = _book_rows(db, user, wanted)
+    if author:
+        query = query.filter(BookORM.authors.ilike(f"%{author.lower()}%"))
+    if shelf:
+        query = query.filter(Pivot.shelf == shelf)
+
+    if ids is None:
+        # unsorted listings come back in id byte order from either source
+        if use_snapshot and shelf:
+            on_shelf = sorted((i for i, s in shelves.items() if s == shelf), key=str.encode)
+            found = _lookup(on_shelf, query, shelves, shelf)
+            return [to_schema(*found[i], wanted) for i in on_shelf if i in found]
+        entries = snapshot.iter_entries() if use_snapshot else None
+        if entries is not None:
+            return [to_schema(e, shelves.get(e.id), wanted) for e in entries]
+        if sort:
+            col = SORT_COLUMNS[sort.lstrip("-")]
+            query = query.order_by(col.desc() if sort.startswith("-") else col)
+        return [to_schema(b, s, wanted) for b, s in query.order_by(_id_order(db)).all()]
+
+    # batch lookup – one IN query instead of N× get_book
+    requested = _parse_ids(ids)
+    found = _lookup(requested, query, shelves, shelf)
+    missing = [i for i in requested if i not in found]
+    if missing:
+        response.headers["X-Missing-Ids"] = ",".join(missing)
+    return [to_schema(*found[i], wanted) for i in requested if i in found]
 
 
 @router.get("/{book_id}", response_model=Book)
 def get_book(
     book_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     user: User = Security(get_current_user),
 ):
     book = db.query(BookORM).filter(BookORM.id == book_id).first()
     if not book:
         raise HTTPException(404, "Book not found")
-    return to_schema(book, _shelf_for(user.id, book_id, db))
+    # carries the caller's shelf → browser may revalidate, shared caches may not store
+    resp = _cached_json(
+        request, to_schema(book, _shelf_for(user.id, book_id, db)), "private, no-cache"
+    )
+    resp.headers["Vary"] = "Authorization"
+    return resp
+
+
+@router.get(
+    "/{book_id}/catalog",
+    response_model=Book,
+    response_model_exclude={"shelf"},
+)
+def get_book_catalog(
+    book_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """Shelf-free catalog record; public so a CDN can cache it for everyone."""
+    book = db.query(BookORM).filter(BookORM.id == book_id).first()
+    if not book:
+        raise HTTPException(404, "Book not found")
+    max_age = settings.CATALOG_CACHE_MAX_AGE
+    return _cached_json(
+        request,
+        to_schema(book),
+        f"public, max-age={max_age}, stale-while-revalidate={max_age}",
+        exclude={"shelf"},
+    )
 
 
 @router.put("/{book_id}", response_model=Book)
@@ -117,28 +411,38 @@ def move_book(
     db: Session = Depends(get_db),
     user: User = Security(get_current_user),
 ):
-    valid = {"currentlyReading", "wantToRead", "read"}
-    if payload.shelf not in valid and payload.shelf not in {None, "", "null"}:
+    if payload.shelf not in SHELVES and payload.shelf not in {None, "", "null"}:
         raise HTTPException(400, "Invalid shelf value")
 
-    pivot = db.query(Pivot).filter_by(user_id=user.id, book_id=book_id).first()
+    # 404 before touching the pivot / counts / version (SQLite won't enforce the FK)
+    book = db.query(BookORM).filter(BookORM.id == book_id).first()
+    if not book:
+        raise HTTPException(404, "Book not found")
 
-    # clear shelf
-    if payload.shelf in {None, "", "null"}:
-        if pivot:
-            db.delete(pivot)
-            db.commit()
-        book = db.query(BookORM).filter(BookORM.id == book_id).first()
-        return to_schema(book)
-
-    # upsert pivot
-    if not pivot:
-        pivot = Pivot(user_id=user.id, book_id=book_id, shelf=payload.shelf)
-        db.add(pivot)
-    else:
-        pivot.shelf = payload.shelf
-    db.commit()
+    shelf = None if payload.shelf in {None, "", "null"} else payload.shelf
+    pivot = db.query(Pivot).filter_by(user_id=user.id, book_id=book_id).first()
 
-    book = db.query(BookORM).filter(BookORM.id == book_id).first()
-    return to_schema(book, payload.shelf)
+    # upsert pivot; clearing keeps the row as a tombstone (shelf = NULL)
+    if (pivot.shelf if pivot else None) != shelf:
+        version = _bump_version(user.id, db)   # row-locks the user: moves serialise here
+        # re-read under that lock so the counts move from the committed shelf
+        pivot = (
+            db.query(Pivot)
+            .filter_by(user_id=user.id, book_id=book_id)
+            .populate_existing()
+            .first()
+        )
+        if not pivot:
+            pivot = Pivot(user_id=user.id, book_id=book_id)
+            db.add(pivot)
+        _adjust_count(user.id, pivot.shelf, -1, db)
+        _adjust_count(user.id, shelf, +1, db)
+        pivot.shelf = shelf
+        pivot.version = version
+        db.commit()
+        broker.publish(
+            user.id,
+            {"type": "shelf", "book_id": book_id, "shelf": shelf, "version": version},
+        )
 
+    return to_schema(book, shelf)
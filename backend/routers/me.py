@@ -0,0 +1,30 @@
+"""
+routers/me.py
+─────────────
+Per-user aggregates, served from `user_shelf_counts` (kept current by
+`move_book`) instead of counting `user_books` on every call.
+"""
+
+from fastapi import APIRouter, Depends, Security
+from sqlalchemy.orm import Session
+
+from core.dependencies import get_db, get_current_user
+from models.shelf_count import UserShelfCount
+from models.user import User
+from schemas.user import ShelfStats
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get("/stats", response_model=ShelfStats)
+def shelf_stats(
+    db: Session = Depends(get_db),
+    user: User = Security(get_current_user),
+):
+    rows = (
+        db.query(UserShelfCount.shelf, UserShelfCount.count)
+        .filter(UserShelfCount.user_id == user.id)
+        .all()
+    )
+    counts = {shelf: count for shelf, count in rows if count}
+    return ShelfStats(**counts, total=sum(counts.values()))
@@ -13,3 +13,14 @@ class Book(BaseModel):
     shelf: Optional[str] = None          # filled per-user via pivot
     imageLinks: Optional[ImageLinks] = None
     description: Optional[str] = None  # Book description
+
+
+class ShelfChange(BaseModel):
+    book_id: str
+    shelf: Optional[str] = None          # null = shelf cleared (tombstone)
+    version: int
+
+
+class BookChanges(BaseModel):
+    version: int                         # new high-water mark → next `since`
+    changes: List[ShelfChange] = []
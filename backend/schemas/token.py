@@ -9,3 +9,8 @@ class Token(BaseModel):
 
 class TokenRefresh(BaseModel):
     refresh_token: str
+
+
+class StreamToken(BaseModel):
+    token: str
+    expires_in: int                      # seconds; only checked when connecting
@@ -13,3 +13,10 @@ class UserOut(BaseModel):
     class Config:
         # pydantic-v2 replacement for `orm_mode = True`
         from_attributes = True
+
+
+class ShelfStats(BaseModel):
+    currentlyReading: int = 0
+    wantToRead: int = 0
+    read: int = 0
+    total: int = 0
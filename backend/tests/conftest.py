@@ -0,0 +1,59 @@
+"""
+Test fixtures: the real app against a throw-away SQLite DB.
+
+`config.settings` is built at import time, so the environment is set up
+here, before anything from the backend is imported.
+"""
+
+import os
+import tempfile
+from itertools import count
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="myreads-tests-"))
+os.environ.update(
+    MODE="dev",
+    DB_ENGINE="sqlite",
+    DB_NAME=str(_TMP / "test.db"),     # absolute → wins over BASE_DIR join
+    SECRET_KEY="test-secret-key-test-secret-key-0000",
+    SEED_DB="false",
+    CATALOG_SNAPSHOT_PATH="",
+)
+
+import pytest                                          # noqa: E402
+from fastapi.testclient import TestClient             # noqa: E402
+
+import models                                          # noqa: E402,F401
+from database import Base, SessionLocal, engine       # noqa: E402
+from main import app                                   # noqa: E402
+from models.book import Book as BookORM               # noqa: E402
+
+BOOK_IDS = [f"book-{i:02d}" for i in range(12)]
+_emails = count()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add_all(
+        BookORM(id=i, title=f"Title {i}", authors="Some Author", thumbnail="", description="")
+        for i in reversed(BOOK_IDS)     # insertion ≠ id order
+    )
+    db.commit()
+    db.close()
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+
+def new_user(client: TestClient) -> tuple[str, dict]:
+    """Sign up a fresh user; returns (user_id, auth headers)."""
+    email = f"user{next(_emails)}@example.com"
+    user_id = client.post("/auth/signup", json={"email": email, "password": "pw"}).json()["id"]
+    token = client.post("/auth/login", json={"email": email, "password": "pw"}).json()
+    return user_id, {"Authorization": f"Bearer {token['access_token']}"}
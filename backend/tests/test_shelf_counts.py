@@ -0,0 +1,65 @@
+"""
+`/me/stats` is served from the `user_shelf_counts` aggregate that
+`move_book` maintains; it must always equal a from-scratch COUNT(*).
+"""
+
+from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+from sqlalchemy import text
+
+from database import SessionLocal
+from tests.conftest import BOOK_IDS, new_user
+
+SHELVES = ("currentlyReading", "wantToRead", "read")
+
+# None / "" / "null" all clear the shelf; repeats of the same value are
+# generated naturally and exercise the "same shelf again" no-op path
+moves = st.lists(
+    st.tuples(
+        st.sampled_from(BOOK_IDS[:5]),     # few books → lots of re-moves
+        st.sampled_from([*SHELVES, None, "", "null"]),
+    ),
+    min_size=1,
+    max_size=25,
+)
+
+
+def scratch_counts(user_id: str) -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text(
+                "SELECT shelf, COUNT(*) FROM user_books "
+                "WHERE user_id = :u AND shelf IS NOT NULL GROUP BY shelf"
+            ),
+            {"u": user_id},
+        ).all()
+    finally:
+        db.close()
+    counts = {shelf: 0 for shelf in SHELVES}
+    counts.update(dict(rows))
+    counts["total"] = sum(counts[s] for s in SHELVES)
+    return counts
+
+
+@settings(max_examples=40, deadline=None, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(steps=moves)
+def test_stats_match_count_from_scratch(client, steps):
+    user_id, headers = new_user(client)
+    for book_id, shelf in steps:
+        resp = client.put(f"/books/{book_id}", json={"shelf": shelf}, headers=headers)
+        assert resp.status_code == 200
+        assert client.get("/me/stats", headers=headers).json() == scratch_counts(user_id)
+
+
+def test_unknown_book_is_404_and_changes_nothing(client):
+    user_id, headers = new_user(client)
+    client.put(f"/books/{BOOK_IDS[0]}", json={"shelf": "read"}, headers=headers)
+    before = client.get("/books/changes", headers=headers).json()
+
+    resp = client.put("/books/nope", json={"shelf": "read"}, headers=headers)
+
+    assert resp.status_code == 404
+    assert client.get("/books/changes", headers=headers).json() == before
+    assert client.get("/me/stats", headers=headers).json() == scratch_counts(user_id)
+    assert scratch_counts(user_id)["read"] == 1
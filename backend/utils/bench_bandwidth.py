@@ -0,0 +1,55 @@
+"""
+Bandwidth benchmark for the seeded catalog.
+
+Serialises the `GET /books` list and every `GET /books/{id}` detail payload
+exactly as the API does, then compresses them with each encoder available
+in `core.compression`.
+
+    python -m utils.bench_bandwidth
+"""
+
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from core.compression import ENCODERS
+from database import SessionLocal
+from models.book import Book as BookORM
+from routers.books import to_schema
+from schemas.book import Book
+
+
+def _row(label: str, raw: int, size: int, ms: float) -> str:
+    return f"{label:<10}{size:>12,}{size / raw:>9.1%}{ms:>10.2f}"
+
+
+def run() -> None:
+    db = SessionLocal()
+    try:
+        books = [to_schema(b) for b in db.query(BookORM).all()]
+    finally:
+        db.close()
+    if not books:
+        print("❌ No books in DB – run the seeder first.")
+        return
+
+    list_body = TypeAdapter(List[Book]).dump_json(books)
+    details = [b.model_dump_json().encode() for b in books]
+
+    for title, bodies in (
+        (f"GET /books  ({len(books)} books, 1 response)", [list_body]),
+        (f"GET /books/{{id}}  ({len(details)} responses)", details),
+    ):
+        raw = sum(len(b) for b in bodies)
+        print(f"\n{title}")
+        print(f"{'encoding':<10}{'bytes':>12}{'ratio':>9}{'ms':>10}")
+        print(_row("identity", raw, raw, 0.0))
+        for name, encode in ENCODERS.items():
+            t0 = time.perf_counter()
+            size = sum(len(encode(b)) for b in bodies)
+            print(_row(name, raw, size, (time.perf_counter() - t0) * 1000))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,200 @@
+"""
+Read-only catalog snapshot shared by every gunicorn worker.
+
+The seeder writes `id / title / authors / thumbnail` for every book into one
+compact file; each worker `mmap`s it, so all of them read the same pages
+from the OS page cache instead of each holding its own copy.
+
+File layout (little-endian)
+    header   "MRCS" | format u16 | reserved u16 | version u64 | count u32
+    index    count × u32 record offsets, sorted by book id
+    records  4 × (u32 length + UTF-8 bytes): id, title, authors, thumbnail
+
+`version` is a content hash, so a reseed that changes nothing keeps it;
+`GET /ready` reports the one a worker has mapped (`catalog_snapshot`).
+Rebuilds go to a temp file + `os.replace`; readers notice the new inode
+and remap on their next lookup (old mappings stay valid until dropped).
+
+    python -m utils.catalog_snapshot        # rebuild by hand
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+from config import BASE_DIR, settings
+from database import SessionLocal
+from models.book import Book as BookORM
+
+MAGIC = b"MRCS"
+FORMAT = 1
+HEADER = struct.Struct("<4sHHQI")
+OFFSET = struct.Struct("<I")
+RELOAD_INTERVAL = 1.0                  # seconds between `stat` checks
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogEntry(NamedTuple):
+    """Duck-types `models.book.Book` for everything but `description`."""
+    id: str
+    title: str
+    authors: str                       # "Neil Gaiman, Terry Pratchett"
+    thumbnail: str
+
+
+def snapshot_path() -> Optional[Path]:
+    if not settings.CATALOG_SNAPSHOT_PATH:
+        return None
+    return BASE_DIR / settings.CATALOG_SNAPSHOT_PATH
+
+
+# ── Writer ────────────────────────────────────────────────────────────────
+def _pack(value: Optional[str]) -> bytes:
+    raw = (value or "").encode("utf-8")
+    return OFFSET.pack(len(raw)) + raw
+
+
+def build_snapshot(path: Optional[Path] = None) -> Optional[int]:
+    """Dump the `books` table to *path* atomically; returns the version."""
+    path = path or snapshot_path()
+    if path is None:
+        return None
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(BookORM.id, BookORM.title, BookORM.authors, BookORM.thumbnail)
+            .all()
+        )
+    finally:
+        db.close()
+    rows.sort(key=lambda r: r.id.encode("utf-8"))
+
+    records = [b"".join(_pack(v) for v in row) for row in rows]
+    body = b"".join(records)
+    version = int.from_bytes(hashlib.sha256(body).digest()[:8], "little")
+
+    offsets, pos = [], HEADER.size + OFFSET.size * len(records)
+    for rec in records:
+        offsets.append(pos)
+        pos += len(rec)
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(HEADER.pack(MAGIC, FORMAT, 0, version, len(records)))
+        fh.write(b"".join(OFFSET.pack(o) for o in offsets))
+        fh.write(body)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    return version
+
+
+# ── Reader ────────────────────────────────────────────────────────────────
+class _Mapped:
+    def __init__(self, path: Path):
+        with open(path, "rb") as fh:
+            self.stat = os.fstat(fh.fileno())
+            self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, _, self.version, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or fmt != FORMAT:
+            raise ValueError(f"{path} is not a format-{FORMAT} catalog snapshot")
+
+    def _str(self, pos: int) -> tuple[str, int]:
+        (n,) = OFFSET.unpack_from(self.mm, pos)
+        return self.mm[pos + 4:pos + 4 + n].decode("utf-8"), pos + 4 + n
+
+    def _id_bytes(self, i: int) -> bytes:
+        (pos,) = OFFSET.unpack_from(self.mm, HEADER.size + OFFSET.size * i)
+        (n,) = OFFSET.unpack_from(self.mm, pos)
+        return self.mm[pos + 4:pos + 4 + n]
+
+    def entry(self, i: int) -> CatalogEntry:
+        (pos,) = OFFSET.unpack_from(self.mm, HEADER.size + OFFSET.size * i)
+        values = []
+        for _ in CatalogEntry._fields:
+            value, pos = self._str(pos)
+            values.append(value)
+        return CatalogEntry(*values)
+
+    def iter_entries(self) -> Iterator[CatalogEntry]:
+        for i in range(self.count):
+            yield self.entry(i)
+
+    def find(self, book_id: str) -> Optional[CatalogEntry]:
+        key = book_id.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:                  # binary search over the sorted index
+            mid = (lo + hi) // 2
+            if self._id_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._id_bytes(lo) == key:
+            return self.entry(lo)
+        return None
+
+
+class CatalogSnapshot:
+    """Process-wide handle; remaps transparently after an atomic swap."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = path
+        self._mapped: Optional[_Mapped] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[_Mapped]:
+        if self.path is None:
+            return None
+        now = time.monotonic()
+        if now - self._checked < RELOAD_INTERVAL:
+            return self._mapped
+        with self._lock:
+            self._checked = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._mapped = None
+                return None
+            m = self._mapped
+            if m is None or (st.st_ino, st.st_mtime_ns) != (m.stat.st_ino, m.stat.st_mtime_ns):
+                try:
+                    self._mapped = _Mapped(self.path)
+                except (OSError, ValueError):
+                    logger.exception("Catalog snapshot %s unusable, falling back to DB", self.path)
+                    self._mapped = None
+            return self._mapped
+
+    @property
+    def version(self) -> Optional[int]:
+        m = self._current()
+        return m.version if m else None
+
+    def get(self, book_id: str) -> Optional[CatalogEntry]:
+        m = self._current()
+        return m.find(book_id) if m else None
+
+    def iter_entries(self) -> Optional[Iterator[CatalogEntry]]:
+        """
+        Decode entries lazily in id order (one at a time, straight off the
+        shared mapping), or None when no snapshot is mapped.
+        """
+        m = self._current()
+        return m.iter_entries() if m else None
+
+
+snapshot = CatalogSnapshot(snapshot_path())
+
+
+if __name__ == "__main__":
+    v = build_snapshot()
+    print(f"✅ Catalog snapshot {v:016x} written." if v is not None
+          else "ℹ️  CATALOG_SNAPSHOT_PATH not set, nothing to build.")
@@ -0,0 +1,101 @@
+"""
+Multi-process-safe startup: migrate + seed under one lock.
+
+Every container runs this before gunicorn; the first to grab the lock
+upgrades the schema and seeds, the rest wait and then find nothing to do.
+
+* Postgres → `pg_advisory_lock` held on the migrating connection
+* SQLite   → exclusive `flock` on `<db file>.migrate.lock`
+
+Alembic runs in-process (no `alembic upgrade head` subprocess).
+
+    python -m utils.migrate
+"""
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from config import BASE_DIR, settings
+from database import engine
+from utils.seeder import seed_books
+
+try:                                   # POSIX only; dev on Windows runs unlocked
+    import fcntl
+except ImportError:                    # pragma: no cover
+    fcntl = None
+
+ALEMBIC_INI = BASE_DIR / "alembic.ini"
+ADVISORY_LOCK_KEY = 0x6D7972656164     # b"myread" – any app-wide bigint
+
+
+def alembic_config(connection: Connection | None = None) -> Config:
+    cfg = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        cfg.attributes["connection"] = connection   # picked up by alembic/env.py
+    return cfg
+
+
+@lru_cache(maxsize=1)
+def head_revisions() -> Set[str]:
+    """Head revision(s) of the migration scripts shipped with this build."""
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(connection: Connection) -> Set[str]:
+    """Revision(s) recorded in the database's `alembic_version` table."""
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+@contextmanager
+def migration_lock(connection: Connection) -> Iterator[None]:
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY})
+        connection.commit()            # session-level lock outlives the txn
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
+            connection.commit()
+        return
+
+    if fcntl is None or not connection.engine.url.database:
+        yield
+        return
+    with open(f"{connection.engine.url.database}.migrate.lock", "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def run_migrations() -> None:
+    with engine.connect() as conn:
+        up_to_date = current_revisions(conn) == head_revisions()
+        conn.commit()
+        if up_to_date and not settings.SEED_DB:
+            print("ℹ️  Schema already at head.")
+            return
+
+        with migration_lock(conn):
+            # re-check: another process may have migrated while we waited
+            pending = current_revisions(conn) != head_revisions()
+            conn.commit()              # don't hold a read txn while seeding
+            if pending:
+                command.upgrade(alembic_config(conn), "head")
+                conn.commit()
+                print(f"✅ Migrated to {', '.join(sorted(head_revisions()))}.")
+            if settings.SEED_DB:
+                seed_books()
+
+
+if __name__ == "__main__":
+    run_migrations()
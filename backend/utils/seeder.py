@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from database import SessionLocal
 from models.book import Book as BookORM
+from utils.catalog_snapshot import build_snapshot
 
 
 def seed_books() -> None:
@@ -55,3 +56,7 @@ def seed_books() -> None:
     if updated:
         msg += f" ✏️ Updated description for {updated} existing books."
     print(msg)
+
+    version = build_snapshot()
+    if version is not None:
+        print(f"✅ Catalog snapshot {version:016x} written.")